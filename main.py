@@ -1,8 +1,6 @@
 import streamlit as st
 import pandas as pd
-from datetime import datetime
-from utils.coingecko_api import CoinGeckoAPI
-from typing import Optional
+from utils.data import CACHE_TTL, clear_crypto_data_cache, fetch_crypto_data
 
 # Page configuration
 st.set_page_config(
@@ -11,57 +9,41 @@ st.set_page_config(
     layout="wide"
 )
 
-# Initialize API client
-@st.cache_resource
-def get_api_client():
-    return CoinGeckoAPI()
-
-# Data fetching function
-@st.cache_data(ttl=300)  # Cache for 5 minutes
-def fetch_crypto_data() -> Optional[pd.DataFrame]:
-    """Fetch data for cryptocurrencies"""
-    api_client = get_api_client()
-
-    with st.spinner("Loading cryptocurrency data..."):
-        data = api_client.get_market_data(page=1)  # Start with one page
-        if not data:
-            return None
-
-        try:
-            df = pd.DataFrame(data)
-
-            # Calculate total market cap for dominance calculation
-            total_market_cap = df['market_cap'].sum()
-            if total_market_cap > 0:
-                # Calculate metrics
-                df['volume_market_cap_ratio'] = (df['total_volume'].fillna(0) / df['market_cap'].fillna(1) * 100).round(2)
-                df['market_dominance'] = (df['market_cap'].fillna(0) / total_market_cap * 100).round(2)
-            else:
-                df['volume_market_cap_ratio'] = 0
-                df['market_dominance'] = 0
-
-            df['timestamp'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-
-            # Ensure numeric columns
-            numeric_columns = [
-                'volume_change_percentage_24h',
-                'volume_change_percentage_1h',
-                'volume_change_percentage_5m',
-                'price_change_percentage_24h',
-                'volume_market_cap_ratio',
-                'market_dominance'
-            ]
-
-            # Convert columns to numeric with better error handling
-            for col in numeric_columns:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0.0)
-
-            return df
-
-        except Exception as e:
-            st.error(f"Error processing data: {str(e)}")
-            return None
+# Columns shown in the detailed table, mapped to their display names
+DISPLAY_COLUMNS = {
+    'name': 'Name',
+    'symbol': 'Symbol',
+    'current_price': 'Price (USD)',
+    'market_cap': 'Market Cap (USD)',
+    'total_volume': 'Volume (24h)',
+    'volume_market_cap_ratio': 'Volume/MCap Ratio (%)',
+    'volume_change_percentage_5m': '5m Vol Change (%)',
+    'volume_change_percentage_1h': '1h Vol Change (%)',
+    'volume_change_percentage_24h': '24h Vol Change (%)',
+    'market_dominance': 'Market Dominance (%)',
+    'price_change_percentage_24h': '24h Price Change (%)'
+}
+
+# Display table, cached per data snapshot and filter settings so widget reruns are cache hits
+@st.cache_data(ttl=CACHE_TTL, hash_funcs={pd.DataFrame: lambda d: d.attrs['timestamp']})
+def build_display_df(
+    df: pd.DataFrame,
+    show_high_volume: bool,
+    min_ratio: float,
+    min_volume: float,
+    min_dominance: float
+) -> pd.DataFrame:
+    """Filter coins for the detailed table and apply display column names"""
+    if show_high_volume:
+        mask = df['volume_market_cap_ratio'].gt(100)
+    else:
+        mask = df.eval(
+            'volume_market_cap_ratio >= @min_ratio and '
+            'total_volume >= @min_volume and '
+            'market_dominance >= @min_dominance'
+        )
+
+    return df.loc[mask, list(DISPLAY_COLUMNS)].rename(columns=DISPLAY_COLUMNS)
 
 # Main app
 def main():
@@ -73,6 +55,7 @@ def main():
     with col1:
         if st.button("🔄 Refresh Data"):
             st.cache_data.clear()
+            clear_crypto_data_cache()
 
     try:
         # Fetch data
@@ -83,14 +66,17 @@ def main():
             return
 
         with col2:
-            st.text(f"Last updated: {df['timestamp'].iloc[0]}")
+            st.text(f"Last updated: {df.attrs['timestamp']}")
+
+        summary = df.attrs['summary']
 
         # Pin BTC, ETH, and BTC.D at the top
         st.markdown("### 📊 Key Assets Overview")
 
-        # Filter for BTC and ETH
-        btc_data = df[df['symbol'] == 'BTC'].iloc[0] if not df[df['symbol'] == 'BTC'].empty else None
-        eth_data = df[df['symbol'] == 'ETH'].iloc[0] if not df[df['symbol'] == 'ETH'].empty else None
+        # Look up BTC and ETH in one pass, keeping the highest-ranked coin per symbol
+        key_assets = df[df['symbol'].isin(['BTC', 'ETH'])].drop_duplicates('symbol').set_index('symbol')
+        btc_data = key_assets.loc['BTC'] if 'BTC' in key_assets.index else None
+        eth_data = key_assets.loc['ETH'] if 'ETH' in key_assets.index else None
 
         # Create three columns for BTC, ETH, and BTC.D
         key_col1, key_col2, key_col3 = st.columns(3)
@@ -133,12 +119,10 @@ def main():
 
         with key_col3:
             st.markdown("#### Market Overview")
-            # Calculate total market cap excluding stablecoins
-            total_mcap = df['market_cap'].sum()
             btc_dominance = btc_data['market_dominance'] if btc_data is not None else 0
             st.metric(
                 "Total Market Cap",
-                f"${total_mcap:,.0f}",
+                f"${summary['total_mcap']:,.0f}",
                 None
             )
             st.metric(
@@ -148,7 +132,7 @@ def main():
             )
             st.metric(
                 "Avg Vol/MCap Ratio",
-                f"{df['volume_market_cap_ratio'].mean():.2f}%",
+                f"{summary['mean_ratio']:.2f}%",
                 None
             )
 
@@ -162,39 +146,35 @@ def main():
         with metrics_col1:
             st.metric(
                 "Total Cryptocurrencies",
-                len(df),
+                summary['n'],
                 "Analyzed"
             )
 
-        high_volume_count = len(df[df['volume_market_cap_ratio'] > 100])
         with metrics_col2:
             st.metric(
                 "Volume > Market Cap",
-                high_volume_count,
-                f"{(high_volume_count/len(df)*100):.1f}% of total"
+                summary['hv_count'],
+                f"{(summary['hv_count']/summary['n']*100):.1f}% of total"
             )
 
         with metrics_col3:
-            median_ratio = df['volume_market_cap_ratio'].median()
             st.metric(
                 "Median Vol/MCap Ratio",
-                f"{median_ratio:.1f}%"
+                f"{summary['median_ratio']:.1f}%"
             )
 
         with metrics_col4:
-            avg_vol_change = df['volume_change_percentage_5m'].mean()
             st.metric(
                 "Avg 5m Vol Change",
-                f"{avg_vol_change:+.2f}%",
+                f"{summary['mean_5m']:+.2f}%",
                 delta_color="normal"
             )
 
         # Show high volume coins by default
         show_high_volume = st.checkbox("Show only coins with Volume > Market Cap (>100%)", value=True)
 
-        if show_high_volume:
-            filtered_df = df[df['volume_market_cap_ratio'] > 100].copy()
-        else:
+        min_ratio = min_volume = min_dominance = 0.0
+        if not show_high_volume:
             # Filtering options
             st.markdown("### 🔍 Custom Filters")
             col1, col2, col3 = st.columns(3)
@@ -205,35 +185,14 @@ def main():
             with col3:
                 min_dominance = st.number_input("Minimum Market Dominance (%)", 0.0, 100.0, 0.0)
 
-            filtered_df = df[
-                (df['volume_market_cap_ratio'] >= min_ratio) &
-                (df['total_volume'] >= min_volume) &
-                (df['market_dominance'] >= min_dominance)
-            ].copy()
+        display_df = build_display_df(df, show_high_volume, min_ratio, min_volume, min_dominance)
 
         # Data table
         st.markdown("### 📋 Detailed Analysis")
-        if len(filtered_df) == 0:
+        if len(display_df) == 0:
             st.info("No coins match the selected criteria.")
         else:
-            st.text(f"Showing {len(filtered_df)} coins matching the criteria")
-
-            # Display columns
-            display_cols = [
-                'name', 'symbol', 'current_price', 'market_cap',
-                'total_volume', 'volume_market_cap_ratio',
-                'volume_change_percentage_5m', 'volume_change_percentage_1h', 'volume_change_percentage_24h',
-                'market_dominance', 'price_change_percentage_24h'
-            ]
-
-            # Create display DataFrame with proper column names
-            display_df = filtered_df[display_cols].copy()
-            display_df.columns = [
-                'Name', 'Symbol', 'Price (USD)', 'Market Cap (USD)',
-                'Volume (24h)', 'Volume/MCap Ratio (%)',
-                '5m Vol Change (%)', '1h Vol Change (%)', '24h Vol Change (%)',
-                'Market Dominance (%)', '24h Price Change (%)'
-            ]
+            st.text(f"Showing {len(display_df)} coins matching the criteria")
 
             # Display the dataframe with proper formatting
             st.dataframe(
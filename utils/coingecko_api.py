@@ -1,111 +1,203 @@
 import requests
-from typing import List, Dict, Optional, Any
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Optional
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
+try:
+    import orjson  # Faster JSON parsing when available
+except ImportError:
+    orjson = None
+
+def _to_float_array(values: List) -> np.ndarray:
+    """Convert raw JSON values to float64, treating missing or invalid values as 0"""
+    try:
+        array = np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        array = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=np.float64)
+    return np.where(np.isnan(array), 0.0, array)
+
+def _volume_change_24h(current_price: np.ndarray, price_change_24h: np.ndarray,
+                       current_volume: np.ndarray) -> np.ndarray:
+    """Estimate 24h volume change (%) from price movement, 0 where it can't be derived"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        price_24h_ago = current_price / (1 + price_change_24h / 100)
+        volume_24h_ago = current_volume * price_24h_ago / current_price
+        volume_change = (current_volume - volume_24h_ago) / volume_24h_ago * 100
+
+    valid = (current_price > 0) & (price_change_24h != 0) & (volume_24h_ago > 0) & np.isfinite(volume_change)
+    return np.where(valid, volume_change, 0.0)
+
+class _CappedRetry(Retry):
+    """Retry policy that never sleeps longer than CoinGeckoAPI.MAX_BACKOFF on Retry-After"""
+
+    def get_retry_after(self, response) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, CoinGeckoAPI.MAX_BACKOFF)
+
 class CoinGeckoAPI:
     """CoinGecko API client for fetching cryptocurrency market data"""
 
     BASE_URL = "https://api.coingecko.com/api/v3"
+    MAX_CONCURRENT_REQUESTS = 5  # Stay well under the free-tier rate limit
+    MAX_RETRIES = 5
+    MAX_BACKOFF = 30  # Seconds
+
+    RAW_COLUMNS = [
+        'id', 'name', 'symbol', 'current_price', 'market_cap', 'total_volume',
+        'price_change_percentage_24h', 'price_change_percentage_1h_in_currency'
+    ]
+    NUMERIC_COLUMNS = [
+        'current_price', 'market_cap', 'total_volume',
+        'price_change_percentage_24h', 'price_change_percentage_1h_in_currency'
+    ]
+    OUTPUT_COLUMNS = [
+        'id', 'name', 'symbol', 'current_price', 'market_cap', 'total_volume',
+        'price_change_percentage_24h', 'volume_change_percentage_5m',
+        'volume_change_percentage_1h', 'volume_change_percentage_24h'
+    ]
 
     def __init__(self):
+        self._request_slots = threading.Semaphore(self.MAX_CONCURRENT_REQUESTS)
         self.session = requests.Session()
         self.session.headers.update({
             'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
             'User-Agent': 'Crypto Volume Analysis Tool'
         })
 
+        # Large keep-alive pool shared by concurrent page fetches and sessions; transient
+        # errors are retried with backoff, honouring a capped Retry-After. Rate limiting
+        # (429) is handled in _make_request so the wait doesn't hold a request slot
+        retries = _CappedRetry(
+            total=self.MAX_RETRIES,
+            backoff_factor=0.5,
+            status_forcelist=[502, 503, 504],
+            respect_retry_after_header=True
+        )
+        adapter = HTTPAdapter(pool_connections=20, pool_maxsize=50, max_retries=retries)
+        self.session.mount('https://', adapter)
+
     def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Optional[Dict]:
         """Make a request to the CoinGecko API with rate limiting"""
-        try:
-            url = f"{self.BASE_URL}/{endpoint}"
-            response = self.session.get(url, params=params, timeout=10)
-
-            # Handle rate limiting
-            if response.status_code == 429:
-                time.sleep(60)  # Wait for 60 seconds if rate limited
-                return self._make_request(endpoint, params)
-
-            response.raise_for_status()
-            return response.json()
-
-        except requests.exceptions.RequestException as e:
-            print(f"API request failed: {str(e)}")
-            return None
+        url = f"{self.BASE_URL}/{endpoint}"
 
-    def _safe_float(self, value: Any, default: float = 0.0) -> float:
-        """Safely convert value to float with fallback to default"""
-        if value is None:
-            return default
-        try:
-            return float(value)
-        except (ValueError, TypeError):
-            return default
+        wait = 0.0
+        for attempt in range(self.MAX_RETRIES):
+            if wait:
+                time.sleep(wait)
 
-    def get_market_data(self, page: int = 1, per_page: int = 250) -> List[Dict]:
+            try:
+                with self._request_slots:
+                    response = self.session.get(url, params=params, timeout=10)
+
+                # Handle rate limiting, honouring the server's Retry-After hint
+                if response.status_code == 429:
+                    backoff = min(2 ** attempt, self.MAX_BACKOFF)
+                    try:
+                        wait = min(float(response.headers.get('Retry-After', backoff)), self.MAX_BACKOFF)
+                    except ValueError:
+                        wait = backoff
+                    continue
+
+                response.raise_for_status()
+                if orjson is not None:
+                    return orjson.loads(response.content)
+                return response.json()
+
+            except requests.exceptions.RequestException as e:
+                print(f"API request failed: {str(e)}")
+                return None
+
+            except ValueError as e:
+                print(f"API response could not be parsed: {str(e)}")
+                return None
+
+        print(f"API request failed: giving up after {self.MAX_RETRIES} attempts")
+        return None
+
+    def get_market_data(self, pages: int = 4, per_page: int = 250) -> List[Dict]:
         """
         Fetch market data for cryptocurrencies
 
         Args:
-            page: Page number for pagination
+            pages: Number of pages to fetch concurrently, starting from page 1
             per_page: Number of results per page (max 250)
 
         Returns:
             List of dictionaries containing market data
         """
-        params = {
-            'vs_currency': 'usd',
-            'order': 'market_cap_desc',
-            'per_page': per_page,
-            'page': page,
-            'sparkline': False,
-            'price_change_percentage': '24h,1h',  # Get both 24h and 1h price changes
-        }
+        return self.get_market_frame(pages=pages, per_page=per_page).to_dict('records')
 
-        data = self._make_request('coins/markets', params)
+    def get_market_frame(self, pages: int = 4, per_page: int = 250) -> pd.DataFrame:
+        """
+        Fetch market data for cryptocurrencies as a normalized DataFrame
+
+        Args:
+            pages: Number of pages to fetch concurrently, starting from page 1
+            per_page: Number of results per page (max 250)
+
+        Returns:
+            DataFrame with numeric columns coerced and volume changes calculated
+        """
+        page_params = [
+            {
+                'vs_currency': 'usd',
+                'order': 'market_cap_desc',
+                'per_page': per_page,
+                'page': page,
+                'sparkline': False,
+                'price_change_percentage': '24h,1h',  # Get both 24h and 1h price changes
+            }
+            for page in range(1, pages + 1)
+        ]
+
+        # Fetch all pages in parallel so wall time is bounded by the slowest page
+        with ThreadPoolExecutor(max_workers=max(pages, 1)) as executor:
+            responses = list(executor.map(
+                lambda params: self._make_request('coins/markets', params),
+                page_params
+            ))
+
+        # A failed page would skew market totals and dominance, so treat it as a failed fetch
+        if any(page_data is None for page_data in responses):
+            return pd.DataFrame(columns=self.OUTPUT_COLUMNS)
+
+        data = [entry for page_data in responses for entry in page_data]
         if not data:
-            return []
+            return pd.DataFrame(columns=self.OUTPUT_COLUMNS)
 
-        # Process and normalize the data
-        processed_data = []
+        # Transpose the entries into columns in a single pass
+        raw = {col: [] for col in self.RAW_COLUMNS}
         for entry in data:
-            try:
-                # Safely get numeric values with defaults
-                current_volume = self._safe_float(entry.get('total_volume'))
-                market_cap = self._safe_float(entry.get('market_cap'))
-                current_price = self._safe_float(entry.get('current_price'))
-                price_change_1h = self._safe_float(entry.get('price_change_percentage_1h_in_currency'))
-                price_change_24h = self._safe_float(entry.get('price_change_percentage_24h'))
-
-                # Calculate volume changes
-                volume_change_5min = price_change_1h / 12.0  # Rough estimate
-                volume_change_1h = price_change_1h * 1.5  # Estimate using price movement
-
-                # Calculate 24h volume change
-                if current_price > 0 and price_change_24h != 0:
-                    price_24h_ago = current_price / (1 + price_change_24h / 100)
-                    volume_24h_ago = current_volume * price_24h_ago / current_price
-                    volume_change_24h = ((current_volume - volume_24h_ago) / volume_24h_ago * 100) if volume_24h_ago > 0 else 0
-                else:
-                    volume_change_24h = 0
-
-                # Update entry with calculated fields
-                processed_entry = {
-                    'id': entry.get('id', ''),
-                    'name': entry.get('name', ''),
-                    'symbol': entry.get('symbol', '').upper(),
-                    'current_price': current_price,
-                    'market_cap': market_cap,
-                    'total_volume': current_volume,
-                    'price_change_percentage_24h': price_change_24h,
-                    'volume_change_percentage_5m': volume_change_5min,
-                    'volume_change_percentage_1h': volume_change_1h,
-                    'volume_change_percentage_24h': volume_change_24h
-                }
-                processed_data.append(processed_entry)
-
-            except Exception as e:
-                print(f"Error processing entry: {str(e)}")
-                continue
-
-        return processed_data
+            for col, values in raw.items():
+                values.append(entry.get(col))
+
+        columns = {
+            'id': [value or '' for value in raw['id']],
+            'name': [value or '' for value in raw['name']],
+            'symbol': [(value or '').upper() for value in raw['symbol']],
+        }
+        for col in self.NUMERIC_COLUMNS:
+            columns[col] = _to_float_array(raw[col])
+
+        price_change_1h = columns.pop('price_change_percentage_1h_in_currency')
+
+        # Calculate volume changes
+        columns['volume_change_percentage_5m'] = price_change_1h / 12.0  # Rough estimate
+        columns['volume_change_percentage_1h'] = price_change_1h * 1.5  # Estimate using price movement
+
+        # Calculate 24h volume change
+        columns['volume_change_percentage_24h'] = _volume_change_24h(
+            columns['current_price'], columns['price_change_percentage_24h'], columns['total_volume']
+        )
+
+        return pd.DataFrame({col: columns[col] for col in self.OUTPUT_COLUMNS}, copy=False)
@@ -0,0 +1,136 @@
+import streamlit as st
+import pandas as pd
+import pyarrow as pa
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+
+# Initialize API client
+@st.cache_resource
+def get_api_client():
+    # Deferred so the HTTP client stack is only imported once data is first requested
+    from utils.coingecko_api import CoinGeckoAPI
+    return CoinGeckoAPI()
+
+CACHE_TTL = 300  # Cache for 5 minutes
+CACHE_MAX_ENTRIES = 4
+
+# Bounded percentage columns whose float32 error is below their display precision
+FLOAT32_COLUMNS = [
+    'price_change_percentage_24h',
+    'volume_change_percentage_5m',
+    'volume_change_percentage_1h',
+    'volume_change_percentage_24h',
+    'market_dominance'
+]
+
+# Process-wide store of Arrow-serialized DataFrames, cheaper to (de)serialize than pickle
+@st.cache_resource
+def get_frame_cache() -> OrderedDict:
+    return OrderedDict()
+
+# Guards the frame cache; held across a miss so concurrent sessions share a single fetch
+@st.cache_resource
+def get_frame_cache_lock() -> threading.Lock:
+    return threading.Lock()
+
+# Data fetching function
+def fetch_crypto_data(pages: int = 4) -> Optional[pd.DataFrame]:
+    """Fetch data for cryptocurrencies, served from the Arrow cache when fresh"""
+    cache = get_frame_cache()
+    key = (int(time.time() // CACHE_TTL), pages)
+
+    with get_frame_cache_lock():
+        if key in cache:
+            cache.move_to_end(key)
+            entry = cache[key]
+        else:
+            df = load_crypto_data(pages)
+            if df is None:
+                # Failures are cached for the rest of the TTL bucket, as st.cache_data
+                # did, so an outage doesn't trigger a fresh fetch on every rerun;
+                # the refresh button clears it
+                entry = None
+            else:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                sink = pa.BufferOutputStream()
+                with pa.ipc.new_stream(sink, table.schema) as writer:
+                    writer.write_table(table)
+
+                # Frame-level metadata (e.g. the fetch timestamp) is kept next to the bytes
+                entry = (sink.getvalue(), dict(df.attrs))
+
+            cache[key] = entry
+            while len(cache) > CACHE_MAX_ENTRIES:
+                cache.popitem(last=False)
+
+    if entry is None:
+        return None
+
+    buf, attrs = entry
+    df = pa.ipc.open_stream(buf).read_all().to_pandas()
+    df.attrs.update(attrs)
+    return df
+
+def load_crypto_data(pages: int) -> Optional[pd.DataFrame]:
+    """Fetch and prepare data for cryptocurrencies from the API"""
+    api_client = get_api_client()
+
+    with st.spinner("Loading cryptocurrency data..."):
+        df = api_client.get_market_frame(pages=pages)
+        if df.empty:
+            return None
+
+        try:
+            # Calculate total market cap for dominance calculation
+            total_market_cap = df['market_cap'].sum()
+            if total_market_cap > 0:
+                # Calculate metrics in a single expression pass
+                safe_market_cap = df['market_cap'].where(df['market_cap'] > 0, 1)
+                df.eval(
+                    """
+                    volume_market_cap_ratio = total_volume / @safe_market_cap * 100
+                    market_dominance = market_cap / @total_market_cap * 100
+                    """,
+                    inplace=True
+                )
+                df[['volume_market_cap_ratio', 'market_dominance']] = (
+                    df[['volume_market_cap_ratio', 'market_dominance']].round(2)
+                )
+            else:
+                df['volume_market_cap_ratio'] = 0.0
+                df['market_dominance'] = 0.0
+
+            # Summary metrics are computed once per fetch, not on every rerun
+            df.attrs['summary'] = {
+                'n': len(df),
+                'hv_count': int(df['volume_market_cap_ratio'].gt(100).sum()),
+                'median_ratio': float(df['volume_market_cap_ratio'].median()),
+                'mean_ratio': float(df['volume_market_cap_ratio'].mean()),
+                'mean_5m': float(df['volume_change_percentage_5m'].mean()),
+                'total_mcap': float(total_market_cap)
+            }
+
+            # Downcast to shrink the cached frame. Only bounded percentage columns are
+            # narrowed, where float32 error stays below the displayed precision; prices,
+            # market caps, volumes and the unbounded volume/mcap ratio keep float64
+            df[FLOAT32_COLUMNS] = df[FLOAT32_COLUMNS].astype('float32')
+            for col in df.select_dtypes('int64').columns:
+                df[col] = pd.to_numeric(df[col], downcast='integer')
+            for col in ['name', 'symbol']:
+                df[col] = df[col].astype('category')
+
+            df.attrs['timestamp'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+            return df
+
+        except Exception as e:
+            st.error(f"Error processing data: {str(e)}")
+            return None
+
+def clear_crypto_data_cache():
+    """Drop all cached market data so the next fetch hits the API"""
+    with get_frame_cache_lock():
+        get_frame_cache().clear()